@@ -1,7 +1,12 @@
 #!/usr/bin/env python3
 import asyncio
 import logging
+import math
 import os
+import re
+import time
+from functools import lru_cache
+from typing import NamedTuple, Optional, Tuple, Union
 
 try:
     from typing import Literal
@@ -9,187 +14,339 @@ except ImportError:
     from typing_extensions import Literal
 
 from metaapi_cloud_sdk import MetaApi
-from prettytable import PrettyTable
-from telegram import ParseMode, Update
-from telegram.ext import CommandHandler, Filters, MessageHandler, Updater, ConversationHandler, CallbackContext
+from metaapi_cloud_sdk.clients.metaApi.notConnectedException import NotConnectedException
+from metaapi_cloud_sdk.clients.timeoutException import TimeoutException
+from telegram import Update
+from telegram.constants import ParseMode
+from telegram.ext import Application, CommandHandler, filters, MessageHandler, ConversationHandler, CallbackContext
 
-# MetaAPI Credentials
-API_KEY = os.environ.get("API_KEY")
-ACCOUNT_ID = os.environ.get("ACCOUNT_ID")
+logger = logging.getLogger(__name__)
 
-# Telegram Credentials
-TOKEN = os.environ.get("TOKEN")
-TELEGRAM_USER = os.environ.get("TELEGRAM_USER")
+# possibles states for conversation handler
+CALCULATE, TRADE, DECISION = range(3)
 
-# Heroku Credentials
-APP_URL = os.environ.get("APP_URL")
+# format of a trade signal, one field per line with up to three take profits
+NUMBER = r'[-+]?(?:\d+\.?\d*|\.\d+)'
+# the pip calculation divides by the multiplier, so a value made only of zeros is not a valid signal
+NONZERO = r'(?![-+]?0*\.?0*\s*\n)'
+SIGNAL_RE = re.compile(
+    r'(?i)(?P<side>BUY|SELL)\s+(?P<sym>\S+)\s*\n'
+    rf'Entry\s+(?P<entry>NOW|{NUMBER})\s*\n'
+    rf'LOTS\s+(?P<lots>{NUMBER})\s*\n'
+    rf'Multiplier\s+{NONZERO}(?P<mult>{NUMBER})\s*\n'
+    rf'SL\s+(?P<sl>{NUMBER})\s*\n'
+    rf'TP\s+(?P<tp1>{NUMBER})'
+    rf'(?:\s*\nTP\s+(?P<tp2>{NUMBER}))?'
+    rf'(?:\s*\nTP\s+(?P<tp3>{NUMBER}))?'
+    r'\s*'
+)
 
-# Port number for Telegram bot web hook
-PORT = int(os.environ.get('PORT', '8443'))
+# MetaAPI client and RPC connection shared across trades
+_api = None
+_connection = None
+_conn_lock = asyncio.Lock()
 
-# Enables logging
-logging.basicConfig(format='%(asctime)s - %(name)s - %(levelname)s - %(message)s', level=logging.INFO)
-logger = logging.getLogger(__name__)
+# seconds to wait for the MetaAPI client to finish closing on shutdown
+CLOSE_TIMEOUT = 10
 
-# possibles states for conversation handler
-CALCULATE, TRADE, DECISION = range(3)
+# errors that mean the connection to MetaAPI itself is broken and has to be re-established
+TRANSPORT_ERRORS = (NotConnectedException, TimeoutException, asyncio.TimeoutError, OSError)
+
+# volume step that each take profit order is rounded down to when the position size is split
+LOT_STEP = 0.01
+
+# account balance cached for a few seconds between back-to-back signals
+BALANCE_TTL = 5
+_bal_cache = {'ts': 0.0, 'val': None}
+
+
+# Helper Classes
+class Config(NamedTuple):
+    """Credentials and settings read from the environment variables at startup."""
+
+    # MetaAPI Credentials
+    api_key: str
+    account_id: str
+
+    # Telegram Credentials
+    token: str
+    telegram_user: str
+
+    # Heroku Credentials
+    app_url: str
+
+    # Port number for Telegram bot web hook
+    port: int
+
+
+class Trade(NamedTuple):
+    """Trade signal information parsed from a Telegram message."""
+
+    order_type: str
+    symbol: str
+    entry: Union[str, float]
+    stop_loss: float
+    tp: Tuple[float, ...]
+    position_size: float
+    multiplier: float
 
 
 # Helper Functions
-def ParseSignal(signal: str) -> dict:
-    """Starts process of parsing signal and entering trade on MetaTrader account.
+def LoadConfig() -> Config:
+    """Reads the bot configuration from the environment variables.
+
+    Returns:
+        a Config that contains the credentials and settings of the bot
+
+    Raises:
+        SystemExit: if a required environment variable is missing or invalid
+    """
+
+    values = {}
+
+    # checks that every required environment variable is set before anything connects
+    for name in ("API_KEY", "ACCOUNT_ID", "TOKEN", "TELEGRAM_USER", "APP_URL"):
+        values[name] = os.environ.get(name)
+
+        if(not(values[name])):
+            raise SystemExit(f"missing env var {name}")
+
+    try:
+        port = int(os.environ.get('PORT', '8443'))
+    except ValueError:
+        raise SystemExit(f"invalid env var PORT: {os.environ.get('PORT')}")
+
+    return Config(
+        api_key=values["API_KEY"],
+        account_id=values["ACCOUNT_ID"],
+        token=values["TOKEN"],
+        telegram_user=values["TELEGRAM_USER"],
+        app_url=values["APP_URL"],
+        port=port,
+    )
+
+
+@lru_cache(maxsize=256)
+def _parse_signal_cached(signal: str) -> Optional[Trade]:
+    """Parses the trade signal, reusing the result when the same signal text is entered again.
 
     Arguments:
         signal: trading signal
 
     Returns:
-        a dictionary that contains trade signal information
+        a Trade that contains trade signal information, or None if the signal is invalid
     """
 
-    # converts message to list of strings for parsing
-    signal = signal.splitlines()
-    signal = [line.rstrip() for line in signal]
+    # extracts every field of the signal in a single pass
+    match = SIGNAL_RE.fullmatch(signal)
 
-    trade = {}
+    # returns None if the signal does not follow the expected format, so numeric conversions below cannot fail
+    if(not(match)):
+        return None
 
-    # determines the order type of the trade
-    if('Sell'.lower() in signal[0].lower()):
-        trade['OrderType'] = 'Sell'
-        
-    elif('Buy'.lower() in signal[0].lower()):
-        trade['OrderType'] = 'Buy'
-    
-    # returns an empty dictionary if an invalid order type was given
-    else:
-        return {}
-
-    # extracts symbol from trade signal
-    trade['Symbol'] = (signal[0].split())[-1].upper()
-    
     # checks wheter or not to convert entry to float because of market exectution option ("NOW")
-    if(trade['OrderType'] == 'Buy' or trade['OrderType'] == 'Sell'):
-        trade['Entry'] = (signal[1].split())[-1]
+    if(match.group('entry').upper() == 'NOW'):
+        entry = 'NOW'
     else:
-        trade['Entry'] = float((signal[1].split())[-1])
-    
-    trade['StopLoss'] = float((signal[4].split())[-1])
-    trade['TP'] = [float((signal[5].split())[-1])]
-    
-    # checks if there's a fourth line and parses it for TP2
-    if(len(signal) > 6):
-        trade['TP'].append(float(signal[6].split()[-1]))
-        
-    if(len(signal) > 7):
-        trade['TP'].append(float(signal[7].split()[-1]))
-        
-    trade['PositionSize'] = float((signal[2].split())[-1])
-    trade['Multiplier'] = float((signal[3].split())[-1])
+        entry = float(match.group('entry'))
+    
+    # collects the first take profit and the optional second and third ones
+    takeProfits = [float(takeProfit) for takeProfit in match.group('tp1', 'tp2', 'tp3') if takeProfit]
+
+    return Trade(
+        order_type=match.group('side').capitalize(),
+        symbol=match.group('sym').upper(),
+        entry=entry,
+        stop_loss=float(match.group('sl')),
+        tp=tuple(takeProfits),
+        position_size=float(match.group('lots')),
+        multiplier=float(match.group('mult')),
+    )
+
+
+def ParseSignal(signal: str) -> Optional[Trade]:
+    """Starts process of parsing signal and entering trade on MetaTrader account.
+
+    Arguments:
+        signal: trading signal
+
+    Returns:
+        a Trade that contains trade signal information, or None if the signal is invalid
+    """
+
+    trade = _parse_signal_cached(signal)
     
-    logger.info(trade['OrderType'])
-    logger.info(trade['Symbol'])
-    logger.info(trade['Entry'])
-    logger.info(trade['Multiplier'])
-    logger.info(trade['PositionSize'])
-    logger.info(trade['StopLoss'])
-    logger.info(trade['TP'])
+    # logs the parsed trade in one record, formatted only when DEBUG is enabled
+    if(trade is not None and logger.isEnabledFor(logging.DEBUG)):
+        logger.debug("parsed %s %s entry=%s mult=%s size=%s sl=%s tp=%s", trade.order_type, trade.symbol, trade.entry, trade.multiplier, trade.position_size, trade.stop_loss, trade.tp)
     
     return trade
     
 
-def GetTradeInformation(update: Update, trade: dict, balance: float) -> None:
+async def GetTradeInformation(update: Update, trade: Trade, balance: float) -> None:
     """Calculates information from given trade including stop loss and take profit in pips, posiition size, and potential loss/profit.
 
     Arguments:
         update: update from Telegram
-        trade: dictionary that stores trade information
+        trade: parsed trade information
         balance: current balance of the MetaTrader account
     """
 
-    # calculates the stop loss in pips
-    stopLossPips = abs(round((trade['StopLoss'] - trade['Entry']) / trade['Multiplier']))
-
-    # calculates the take profit(s) in pips
-    takeProfitPips = []
-    for takeProfit in trade['TP']:
-        takeProfitPips.append(abs(round((takeProfit - trade['Entry']) / trade['Multiplier'])))
+    # calculates the stop loss and take profit(s) in pips in a single pass over every price
+    stopLossPips, *takeProfitPips = [abs(round((price - trade.entry) / trade.multiplier)) for price in (trade.stop_loss, *trade.tp)]
         
     # creates table with trade information
     table = CreateTable(trade, balance, stopLossPips, takeProfitPips)
     
     # sends user trade information and calcualted risk
-    update.effective_message.reply_text(f'<pre>{table}</pre>', parse_mode=ParseMode.HTML)
+    await update.effective_message.reply_text(f'<pre>{table}</pre>', parse_mode=ParseMode.HTML)
 
     return
     
 
-def CreateTable(trade: dict, balance: float, stopLossPips: int, takeProfitPips: int) -> PrettyTable:
-    """Creates PrettyTable object to display trade information to user.
+def RenderTable(rows: list, title: str) -> str:
+    """Renders key/value rows as a fixed-width text table.
 
     Arguments:
-        trade: dictionary that stores trade information
+        rows: list of [key, value] pairs, either of which may span several lines
+        title: title displayed above the table
+
+    Returns:
+        the rendered table
+    """
+
+    # splits every cell into its lines so multi-line rows stay aligned
+    cells = [(str(key).split('\n'), str(value).split('\n')) for key, value in rows]
+
+    # computes the column widths once from the widest line in each column
+    keyWidth = max(len(line) for keys, _ in cells for line in keys + ['Key'])
+    valueWidth = max(len(line) for _, values in cells for line in values + ['Value'])
+    valueWidth = max(valueWidth, len(title) - keyWidth - 3)
+
+    border = f"+{'-' * (keyWidth + 2)}+{'-' * (valueWidth + 2)}+"
+
+    lines = [
+        f"+{'-' * (keyWidth + valueWidth + 5)}+",
+        f"| {title:^{keyWidth + valueWidth + 3}} |",
+        border,
+        f"| {'Key':<{keyWidth}} | {'Value':<{valueWidth}} |",
+        border,
+    ]
+
+    for keys, values in cells:
+        # pads the shorter cell so both columns span the same number of lines
+        height = max(len(keys), len(values))
+        keys += [''] * (height - len(keys))
+        values += [''] * (height - len(values))
+
+        lines.extend(f"| {key:<{keyWidth}} | {value:<{valueWidth}} |" for key, value in zip(keys, values))
+
+    lines.append(border)
+
+    return '\n'.join(lines)
+
+
+def LegSize(trade: Trade) -> float:
+    """Splits the position size of the trade evenly across its take profits.
+
+    Arguments:
+        trade: parsed trade information
+
+    Returns:
+        the volume of each take profit order, rounded down to LOT_STEP (0 if the
+        position size is too small to give every take profit one step)
+    """
+
+    # rounds the step count first so float noise (e.g. 0.3 / 0.01 = 29.999...) does not lose a step
+    steps = math.floor(round(trade.position_size / len(trade.tp) / LOT_STEP, 9))
+
+    return round(steps * LOT_STEP, 9)
+
+
+def CalculateRisk(trade: Trade, balance: float, stopLossPips: int, takeProfitPips: list) -> tuple:
+    """Calculates the potential loss, risk, and potential profit of a trade.
+
+    Arguments:
+        trade: parsed trade information
         balance: current balance of the MetaTrader account
         stopLossPips: the difference in pips from stop loss price to entry price
+        takeProfitPips: the difference in pips from each take profit price to entry price
 
     Returns:
-        a Pretty Table object that contains trade information
+        a tuple of the potential loss, risk percentage, profit of each take profit, and total profit
     """
 
-    # creates prettytable object
-    table = PrettyTable()
-    
-    potentialLoss = round((trade['PositionSize'] * 10) * stopLossPips * len(takeProfitPips), 2)
-    risk = round(((potentialLoss * 100) / balance))
-    
-    table.title = "Trade Information"
-    table.field_names = ["Key", "Value"]
-    table.align["Key"] = "l"  
-    table.align["Value"] = "l" 
-    table.add_row([trade["OrderType"] , trade["Symbol"]])
-    table.add_row(['Entry\n', trade['Entry']])
-    
-    table.add_row(['Position Size', trade['PositionSize']])
-    table.add_row(['Risk', '{:,.0f} %'.format(risk)])
-    table.add_row(['Multiplier', trade['Multiplier']])
-    
-    table.add_row(['\nStop Loss', '\n{} pips'.format(stopLossPips)])
+    # value of one pip for each take profit order, using the volume that is actually placed
+    legPipValue = LegSize(trade) * 10
+
+    potentialLoss = round(legPipValue * len(takeProfitPips) * stopLossPips, 2)
+    risk = round((potentialLoss * 100) / balance)
+
+    # potential profit from each take profit target
+    profits = [round(legPipValue * takeProfit, 2) for takeProfit in takeProfitPips]
+
+    return potentialLoss, risk, profits, sum(profits)
+
+
+def CreateTable(trade: Trade, balance: float, stopLossPips: int, takeProfitPips: int) -> str:
+    """Creates table to display trade information to user.
+
+    Arguments:
+        trade: parsed trade information
+        balance: current balance of the MetaTrader account
+        stopLossPips: the difference in pips from stop loss price to entry price
+
+    Returns:
+        the rendered table that contains trade information
+    """
+
+    potentialLoss, risk, profits, totalProfit = CalculateRisk(trade, balance, stopLossPips, takeProfitPips)
+
+    # collects every row first so the table is rendered in a single pass
+    rows = [
+        [trade.order_type , trade.symbol],
+        ['Entry\n', trade.entry],
+        ['Position Size', round(LegSize(trade) * len(trade.tp), 9)],
+        ['Risk', f'{risk:,.0f} %'],
+        ['Multiplier', trade.multiplier],
+        ['\nStop Loss', f'\n{stopLossPips} pips'],
+    ]
     
-    for count, takeProfit in enumerate(takeProfitPips):
-        table.add_row([f'TP {count + 1}', f'{takeProfit} pips'])
+    rows.extend([f'TP {count + 1}', f'{takeProfit} pips'] for count, takeProfit in enumerate(takeProfitPips))
     
-    table.add_row(['\nCurrent Balance', '\n$ {:,.2f}'.format(balance)])
+    rows.append(['\nCurrent Balance', f'\n$ {balance:,.2f}'])
 
-    # total potential profit from trade
-    totalProfit = 0
-    
-    for count, takeProfit in enumerate(takeProfitPips):
-        profit = round((trade['PositionSize'] * 10 * (1 / len(takeProfitPips))) * takeProfit, 2)
-        table.add_row([f'TP {count + 1} Profit', '$ {:,.2f}'.format(profit)])
-        
-        # sums potential profit from each take profit target
-        totalProfit += profit
+    rows.extend([f'TP {count + 1} Profit', f'$ {profit:,.2f}'] for count, profit in enumerate(profits))
 
-    table.add_row(['\nTotal Profit', '\n$ {:,.2f}'.format(totalProfit)])
-    table.add_row(['Potential Loss', '$ {:,.2f}'.format(potentialLoss)])
-    
-    return table
+    rows.append(['\nTotal Profit', f'\n$ {totalProfit:,.2f}'])
+    rows.append(['Potential Loss', f'$ {potentialLoss:,.2f}'])
+
+    return RenderTable(rows, "Trade Information")
     
 
-async def ConnectMetaTrader(update: Update, trade: dict, enterTrade: bool):
-    """Attempts connection to MetaAPI and MetaTrader to place trade.
+async def _ensure_connection(config: Config):
+    """Lazily creates the MetaAPI client and RPC connection, reusing them across trades.
 
     Arguments:
-        update: update from Telegram
-        trade: dictionary that stores trade information
+        config: credentials and settings of the bot
 
     Returns:
-        A coroutine that confirms that the connection to MetaAPI/MetaTrader and trade placement were successful
+        the synchronized RPC connection to the MetaTrader account
     """
 
-    # creates connection to MetaAPI
-    api = MetaApi(API_KEY)
-    
-    try:
-        account = await api.metatrader_account_api.get_account(ACCOUNT_ID)
+    global _api, _connection
+
+    async with _conn_lock:
+
+        # skips the deploy and synchronization handshakes once a connection is established
+        if(_connection is not None):
+            return _connection
+
+        # creates the MetaAPI client once per process so its HTTP session and websocket are reused
+        if(_api is None):
+            _api = MetaApi(config.api_key)
+
+        account = await _api.metatrader_account_api.get_account(config.account_id)
         initial_state = account.state
         deployed_states = ['DEPLOYING', 'DEPLOYED']
 
@@ -203,101 +360,246 @@ async def ConnectMetaTrader(update: Update, trade: dict, enterTrade: bool):
 
         # connect to MetaApi API
         connection = account.get_rpc_connection()
-        await connection.connect()
 
-        # wait until terminal state synchronized to the local state
-        logger.info('Waiting for SDK to synchronize to terminal state ...')
-        await connection.wait_synchronized()
+        try:
+            await connection.connect()
+
+            # wait until terminal state synchronized to the local state
+            logger.info('Waiting for SDK to synchronize to terminal state ...')
+            await connection.wait_synchronized()
+
+        # closes the half-open connection instead of leaving it registered with the SDK
+        except Exception:
+            await connection.close()
+            raise
+
+        _connection = connection
+
+        return _connection
+
+
+async def _invalidate_connection() -> None:
+    """Closes and drops the cached RPC connection so the next request re-synchronizes with MetaTrader."""
+
+    global _connection
+
+    connection, _connection = _connection, None
+
+    # the SDK hands out a new connection instance on every connect, so the old one has to be closed
+    if(connection is not None):
+        try:
+            await connection.close()
+        except Exception as error:
+            logger.warning(f'Error closing MetaAPI connection: {error}')
+
+    return
+
+
+async def _close_connection(application: Application) -> None:
+    """Closes the RPC connection and the MetaAPI client when the bot shuts down.
+
+    Arguments:
+        application: Telegram application that is shutting down
+    """
+
+    global _api
+
+    # remembers the running tasks, since the SDK close methods only schedule the real shutdown as new ones
+    pending = asyncio.all_tasks()
+
+    await _invalidate_connection()
+
+    # releases the HTTP session and websocket clients held by the MetaAPI client
+    if(_api is not None):
+        _api.close()
+        _api = None
+
+    # waits for the scheduled close tasks before the application closes the event loop
+    closing = asyncio.all_tasks() - pending
+
+    if(closing):
+        await asyncio.wait(closing, timeout=CLOSE_TIMEOUT)
 
-        # obtains account information from MetaTrader server
-        account_information = await connection.get_account_information()
+    return
+
+
+async def ConnectMetaTrader(update: Update, config: Config, trade: Trade, enterTrade: bool, showTable: bool = True):
+    """Attempts connection to MetaAPI and MetaTrader to place trade.
+
+    Arguments:
+        update: update from Telegram
+        config: credentials and settings of the bot
+        trade: parsed trade information
+        enterTrade: whether or not to place the trade on the MetaTrader account
+        showTable: whether to send the trade information table or only a one-line summary of the trade
+
+    Returns:
+        A coroutine that confirms that the connection to MetaAPI/MetaTrader and trade placement were successful
+    """
+
+    try:
+        # reuses the cached connection to MetaAPI/MetaTrader when available
+        connection = await _ensure_connection(config)
 
-        update.effective_message.reply_text("Successfully connected to MetaTrader!\nCalculating trade risk ... 🤔")
+        # sends a compact confirmation when the user has already decided to enter the trade
+        if(not(showTable)):
+            takeProfits = ', '.join(str(takeProfit) for takeProfit in trade.tp)
+            await update.effective_message.reply_text(f"Successfully connected to MetaTrader!\n{trade.order_type} {trade.symbol} | Entry {trade.entry} | Lots {LegSize(trade)} x {len(trade.tp)} | SL {trade.stop_loss} | TPs {takeProfits}")
 
-        # checks if the order is a market execution to get the current price of symbol
-        if(trade['Entry'] == 'NOW'):
-            price = await connection.get_symbol_price(symbol=trade['Symbol'])
+        # the balance and current price are only needed to produce the trade information table
+        else:
 
-            # uses bid price if the order type is a buy
-            if(trade['OrderType'] == 'Buy'):
-                trade['Entry'] = float(price['bid'])
+            # obtains account balance from MetaTrader server unless it was fetched moments ago
+            now = time.monotonic()
 
-            # uses ask price if the order type is a sell
-            if(trade['OrderType'] == 'Sell'):
-                trade['Entry'] = float(price['ask'])
+            if(_bal_cache['val'] is None or now - _bal_cache['ts'] >= BALANCE_TTL):
+                account_information = await connection.get_account_information()
+                _bal_cache['ts'] = now
+                _bal_cache['val'] = account_information['balance']
 
-        # produces a table with trade information
-        GetTradeInformation(update, trade, account_information['balance'])
+            balance = _bal_cache['val']
+
+            await update.effective_message.reply_text("Successfully connected to MetaTrader!\nCalculating trade risk ... 🤔")
+
+            # checks if the order is a market execution to get the current price of symbol
+            if(trade.entry == 'NOW'):
+                price = await connection.get_symbol_price(symbol=trade.symbol)
+
+                # uses bid price if the order type is a buy
+                if(trade.order_type == 'Buy'):
+                    trade = trade._replace(entry=float(price['bid']))
+
+                # uses ask price if the order type is a sell
+                if(trade.order_type == 'Sell'):
+                    trade = trade._replace(entry=float(price['ask']))
+
+            # produces a table with trade information
+            await GetTradeInformation(update, trade, balance)
             
         # checks if the user has indicated to enter trade
         if(enterTrade == True):
 
             # enters trade on to MetaTrader account
-            update.effective_message.reply_text("Entering trade on MetaTrader Account ... 👨🏾‍💻")
-
-            try:
-                # executes buy market execution order
-                if(trade['OrderType'] == 'Buy'):
-                    for takeProfit in trade['TP']:
-                        result = await connection.create_market_buy_order(trade['Symbol'], trade['PositionSize'], trade['StopLoss'], takeProfit)
-
-                # executes sell market execution order
-                elif(trade['OrderType'] == 'Sell'):
-                    for takeProfit in trade['TP']:
-                        result = await connection.create_market_sell_order(trade['Symbol'], trade['PositionSize'], trade['StopLoss'], takeProfit)
-             
-                # sends success message to user
-                update.effective_message.reply_text("Trade entered successfully! 💰")
-                
-                # prints success message to console
-                logger.info('\nTrade entered successfully!')
-                logger.info('Result Code: {}\n'.format(result['stringCode']))
-            
-            except Exception as error:
-                logger.info(f"\nTrade failed with error: {error}\n")
-                update.effective_message.reply_text(f"There was an issue 😕\n\nError Message:\n{error}")
+            await update.effective_message.reply_text("Entering trade on MetaTrader Account ... 👨🏾‍💻")
+
+            # selects the market execution order matching the order type
+            if(trade.order_type == 'Buy'):
+                createOrder = connection.create_market_buy_order
+            else:
+                createOrder = connection.create_market_sell_order
+
+            # splits the position size across the take profits with the same volume the table reports
+            legSize = LegSize(trade)
+
+            # places the order for every take profit concurrently
+            results = await asyncio.gather(*[createOrder(trade.symbol, legSize, trade.stop_loss, takeProfit) for takeProfit in trade.tp], return_exceptions=True)
+
+            # reports the outcome of each take profit order individually
+            filled = []
+            failed = []
+
+            for count, result in enumerate(results):
+                if(isinstance(result, Exception)):
+                    failed.append(count + 1)
+
+                    # broker rejections leave the connection usable, only transport errors force a re-sync
+                    if(isinstance(result, TRANSPORT_ERRORS)):
+                        await _invalidate_connection()
+
+                    logger.info(f"\nTP {count + 1} failed with error: {result}\n")
+                    await update.effective_message.reply_text(f"There was an issue with TP {count + 1} 😕\n\nError Message:\n{result}")
+
+                else:
+                    filled.append(count + 1)
+
+                    # forces the next trade to fetch the balance affected by this order
+                    _bal_cache['val'] = None
+
+                    # prints success message to console
+                    logger.info(f'\nTP {count + 1} entered successfully!')
+                    logger.info('Result Code: {}\n'.format(result['stringCode']))
+
+            # sends success message to user, or which take profits are open when only some were placed
+            if(not(failed)):
+                await update.effective_message.reply_text("Trade entered successfully! 💰")
+
+            else:
+                heading = "Trade partially entered ⚠️" if filled else "Trade was not entered 😕"
+                filledTPs = ', '.join(f'TP {number}' for number in filled) or 'None'
+                failedTPs = ', '.join(f'TP {number}' for number in failed)
+                await update.effective_message.reply_text(f"{heading}\n\nFilled: {filledTPs}\nFailed: {failedTPs}")
     
     except Exception as error:
+        # errors such as an unknown symbol or a failed Telegram reply keep the connection
+        if(isinstance(error, TRANSPORT_ERRORS)):
+            await _invalidate_connection()
+
         logger.error(f'Error: {error}')
-        update.effective_message.reply_text(f"There was an issue with the connection 😕\n\nError Message:\n{error}")
+        await update.effective_message.reply_text(f"There was an issue with the connection 😕\n\nError Message:\n{error}")
     
     return
 
 
 # Handler Functions
-def PlaceTrade(update: Update, context: CallbackContext) -> int:
-    """Parses trade and places on MetaTrader account.   
-    
+async def _parse_or_reject(update: Update, context: CallbackContext, retry_state: int) -> Optional[int]:
+    """Parses the trade from the user's message unless it has already been parsed.
+
     Arguments:
         update: update from Telegram
         context: CallbackContext object that stores commonly used objects in handler callbacks
+        retry_state: conversation state to return to when the trade could not be parsed
+
+    Returns:
+        retry_state if the trade could not be parsed or split across its take profits, otherwise None
     """
 
     # checks if the trade has already been parsed or not
-    if(context.user_data['trade'] == None):
+    if(context.user_data['trade'] != None):
+        return None
 
-        try: 
-            # parses signal from Telegram message
-            trade = ParseSignal(update.effective_message.text)
-            
-            # checks if there was an issue with parsing the trade
-            if(not(trade)):
-                raise Exception('Invalid Trade')
+    # parses signal from Telegram message
+    trade = ParseSignal(update.effective_message.text)
+    
+    # checks if there was an issue with parsing the trade
+    if(not(trade)):
+        logger.error('Error: Invalid Trade')
+        errorMessage = "There was an error parsing this trade 😕\n\nError: Invalid Trade\n\nPlease re-enter trade with this format:\n\nBUY/SELL SYMBOL\nEntry \nLOTS \nMultiplier \nSL \nTP \n(TP) \n(TP) \n\nOr use the /cancel to command to cancel this action."
+        await update.effective_message.reply_text(errorMessage)
+
+        # returns to the given state to reattempt trade parsing
+        return retry_state
+
+    # checks that every take profit order gets at least the minimum volume
+    if(LegSize(trade) < LOT_STEP):
+        logger.error('Error: Position Size Too Small')
+        errorMessage = f"There was an error parsing this trade 😕\n\nError: LOTS {trade.position_size} cannot be split across {len(trade.tp)} TPs\n\nPlease re-enter the trade with at least {round(len(trade.tp) * LOT_STEP, 9)} LOTS or fewer TPs.\n\nOr use the /cancel to command to cancel this action."
+        await update.effective_message.reply_text(errorMessage)
+
+        return retry_state
+
+    # sets the user context trade equal to the parsed trade
+    context.user_data['trade'] = trade
+    await update.effective_message.reply_text("Trade Successfully Parsed! 🥳\nConnecting to MetaTrader ... \n(May take a while) ⏰")
+
+    return None
 
-            # sets the user context trade equal to the parsed trade
-            context.user_data['trade'] = trade
-            update.effective_message.reply_text("Trade Successfully Parsed! 🥳\nConnecting to MetaTrader ... \n(May take a while) ⏰")
-        
-        except Exception as error:
-            logger.error(f'Error: {error}')
-            errorMessage = f"There was an error parsing this trade 😕\n\nError: {error}\n\nPlease re-enter trade with this format:\n\nBUY/SELL SYMBOL\nEntry \nLOTS \nMultiplier \nSL \nTP \n(TP) \n(TP) \n\nOr use the /cancel to command to cancel this action."
-            update.effective_message.reply_text(errorMessage)
 
-            # returns to TRADE state to reattempt trade parsing
-            return TRADE
+async def PlaceTrade(update: Update, context: CallbackContext) -> int:
+    """Parses trade and places on MetaTrader account.   
     
-    # attempts connection to MetaTrader and places trade
-    asyncio.run(ConnectMetaTrader(update, context.user_data['trade'], True))
+    Arguments:
+        update: update from Telegram
+        context: CallbackContext object that stores commonly used objects in handler callbacks
+    """
+
+    # returns to TRADE state if the trade could not be parsed
+    retry = await _parse_or_reject(update, context, TRADE)
+
+    if(retry is not None):
+        return retry
+    
+    # attempts connection to MetaTrader and places trade without rebuilding the trade information table
+    await ConnectMetaTrader(update, context.bot_data['config'], context.user_data['trade'], True, showTable=False)
     
     # removes trade from user context data
     context.user_data['trade'] = None
@@ -305,64 +607,57 @@ def PlaceTrade(update: Update, context: CallbackContext) -> int:
     return ConversationHandler.END
     
 
-def CalculateTrade(update: Update, context: CallbackContext) -> int:
-    """Parses trade and places on MetaTrader account.   
+async def CalculateTrade(update: Update, context: CallbackContext) -> int:
+    """Parses trade and calculates trade information from MetaTrader account.   
     
     Arguments:
         update: update from Telegram
         context: CallbackContext object that stores commonly used objects in handler callbacks
     """
 
-    # checks if the trade has already been parsed or not
-    if(context.user_data['trade'] == None):
+    # returns to CALCULATE state if the trade could not be parsed
+    retry = await _parse_or_reject(update, context, CALCULATE)
 
-        try: 
-            # parses signal from Telegram message
-            trade = ParseSignal(update.effective_message.text)
-            
-            # checks if there was an issue with parsing the trade
-            if(not(trade)):
-                raise Exception('Invalid Trade')
-
-            # sets the user context trade equal to the parsed trade
-            context.user_data['trade'] = trade
-            update.effective_message.reply_text("Trade Successfully Parsed! 🥳\nConnecting to MetaTrader ... (May take a while) ⏰")
-        
-        except Exception as error:
-            logger.error(f'Error: {error}')
-            errorMessage = f"There was an error parsing this trade 😕\n\nError: {error}\n\nPlease re-enter trade with this format:\n\nBUY/SELL SYMBOL\nEntry \nLOTS \nMultiplier \nSL \nTP \n\nOr use the /cancel to command to cancel this action."
-            update.effective_message.reply_text(errorMessage)
-
-            # returns to CALCULATE to reattempt trade parsing
-            return CALCULATE
+    if(retry is not None):
+        return retry
     
     # attempts connection to MetaTrader and calculates trade information
-    asyncio.run(ConnectMetaTrader(update, context.user_data['trade'], False))
+    await ConnectMetaTrader(update, context.bot_data['config'], context.user_data['trade'], False)
 
     # asks if user if they would like to enter or decline trade
-    update.effective_message.reply_text("Souhaitez-vous envoyer cette transaction ? Pour l'envoyer, sélectionnez : /yes\nPour annuler, sélectionnez : /no")
+    await update.effective_message.reply_text("Souhaitez-vous envoyer cette transaction ? Pour l'envoyer, sélectionnez : /yes\nPour annuler, sélectionnez : /no")
 
     return DECISION
     
 
-def unknown_command(update: Update, context: CallbackContext) -> None:
-    """Checks if the user is authorized to use this bot or shares to use /help command for instructions.
+async def unknown_command(update: Update, context: CallbackContext) -> None:
+    """Shares to use /help command for instructions.
 
     Arguments:
         update: update from Telegram
         context: CallbackContext object that stores commonly used objects in handler callbacks
     """
-    if(not(update.effective_message.chat.username == TELEGRAM_USER)):
-        update.effective_message.reply_text("Vous n'êtes pas autorisé à utiliser ce robot ! 🙅🏽‍♂️")
-        return
 
-    update.effective_message.reply_text("Commande inconnue. Utilisez /trade pour placer une transaction ou /calculate pour obtenir des informations sur une transaction. Vous pouvez également utiliser la commande /help pour consulter les instructions relatives à ce robot.")
+    await update.effective_message.reply_text("Commande inconnue. Utilisez /trade pour placer une transaction ou /calculate pour obtenir des informations sur une transaction. Vous pouvez également utiliser la commande /help pour consulter les instructions relatives à ce robot.")
+
+    return
+
+
+async def unauthorized(update: Update, context: CallbackContext) -> None:
+    """Informs the user that they are not authorized to use this bot.
+
+    Arguments:
+        update: update from Telegram
+        context: CallbackContext object that stores commonly used objects in handler callbacks
+    """
+
+    await update.effective_message.reply_text("Vous n'êtes pas autorisé à utiliser ce robot ! 🙅🏽‍♂️")
 
     return
 
 
 # Command Handlers
-def welcome(update: Update, context: CallbackContext) -> None:
+async def welcome(update: Update, context: CallbackContext) -> None:
     """Sends welcome message to user.
 
     Arguments:
@@ -373,12 +668,12 @@ def welcome(update: Update, context: CallbackContext) -> None:
     welcome_message = "Bienvenue sur le bot Telegram de FX Signal Copier ! 💻💸\nVous pouvez utiliser ce bot pour entrer dans les transactions directement à partir de Telegram et obtenir un aperçu détaillé de votre ratio risque-récompense avec le profit, la perte. Vous êtes en mesure de modifier des paramètres spécifiques tels que les symboles autorisés, le facteur de risque, et plus encore à partir de votre script Python personnalisé et des variables d'environnement.\nUtilisez la commande /help pour afficher des instructions et des exemples de transactions."
     
     # sends messages to user
-    update.effective_message.reply_text(welcome_message)
+    await update.effective_message.reply_text(welcome_message)
 
     return
     
 
-def help(update: Update, context: CallbackContext) -> None:
+async def help(update: Update, context: CallbackContext) -> None:
     """Sends a help message when the command /help is issued
 
     Arguments:
@@ -392,14 +687,14 @@ def help(update: Update, context: CallbackContext) -> None:
     market_execution_example = "Market Execution:\nBUY GBPUSD\nEntry NOW\nLOTS 0.01\nMultiplier 1\nSL 1.14336\nTP 1.28930\nTP 1.29845\nTP 1.29999\n\n"
     
     # sends messages to user
-    # update.effective_message.reply_text(help_message)
-    update.effective_message.reply_text(commands)
-    update.effective_message.reply_text(trade_example + market_execution_example)
+    # await update.effective_message.reply_text(help_message)
+    await update.effective_message.reply_text(commands)
+    await update.effective_message.reply_text(trade_example + market_execution_example)
 
     return
     
 
-def cancel(update: Update, context: CallbackContext) -> int:
+async def cancel(update: Update, context: CallbackContext) -> int:
     """Cancels and ends the conversation.   
     
     Arguments:
@@ -407,7 +702,7 @@ def cancel(update: Update, context: CallbackContext) -> int:
         context: CallbackContext object that stores commonly used objects in handler callbacks
     """
 
-    update.effective_message.reply_text("La commande a été annulée.")
+    await update.effective_message.reply_text("La commande a été annulée.")
 
     # removes trade from user context data
     context.user_data['trade'] = None
@@ -415,7 +710,7 @@ def cancel(update: Update, context: CallbackContext) -> int:
     return ConversationHandler.END
     
 
-def error(update: Update, context: CallbackContext) -> None:
+async def error(update: Update, context: CallbackContext) -> None:
     """Logs Errors caused by updates.
 
     Arguments:
@@ -428,42 +723,36 @@ def error(update: Update, context: CallbackContext) -> None:
     return
     
 
-def Trade_Command(update: Update, context: CallbackContext) -> int:
+async def Trade_Command(update: Update, context: CallbackContext) -> int:
     """Asks user to enter the trade they would like to place.
 
     Arguments:
         update: update from Telegram
         context: CallbackContext object that stores commonly used objects in handler callbacks
     """
-    if(not(update.effective_message.chat.username == TELEGRAM_USER)):
-        update.effective_message.reply_text("Vous n'êtes pas autorisé à utiliser ce robot ! 🙅🏽‍♂️")
-        return ConversationHandler.END
-    
+
     # initializes the user's trade as empty prior to input and parsing
     context.user_data['trade'] = None
     
     # asks user to enter the trade
-    update.effective_message.reply_text("Veuillez saisir le trade que vous souhaitez effectuer.")
+    await update.effective_message.reply_text("Veuillez saisir le trade que vous souhaitez effectuer.")
 
     return TRADE
     
 
-def Calculation_Command(update: Update, context: CallbackContext) -> int:
+async def Calculation_Command(update: Update, context: CallbackContext) -> int:
     """Asks user to enter the trade they would like to calculate trade information for.
 
     Arguments:
         update: update from Telegram
         context: CallbackContext object that stores commonly used objects in handler callbacks
     """
-    if(not(update.effective_message.chat.username == TELEGRAM_USER)):
-        update.effective_message.reply_text("Vous n'êtes pas autorisé à utiliser ce robot ! 🙅🏽‍♂️")
-        return ConversationHandler.END
 
     # initializes the user's trade as empty prior to input and parsing
     context.user_data['trade'] = None
 
     # asks user to enter the trade
-    update.effective_message.reply_text("Veuillez saisir le trade que vous souhaitez calculer.")
+    await update.effective_message.reply_text("Veuillez saisir le trade que vous souhaitez calculer.")
 
     return CALCULATE
 
@@ -471,39 +760,51 @@ def Calculation_Command(update: Update, context: CallbackContext) -> int:
 def main() -> None:
     """Runs the Telegram bot."""
 
-    updater = Updater(TOKEN, use_context=True)
+    # Enables logging
+    logging.basicConfig(format='%(asctime)s - %(name)s - %(levelname)s - %(message)s', level=logging.INFO)
+
+    # reads the configuration once, failing fast on missing environment variables
+    config = LoadConfig()
 
-    # get the dispatcher to register handlers
-    dp = updater.dispatcher
+    # the MetaAPI client is closed once when the application shuts down
+    application = Application.builder().token(config.token).post_shutdown(_close_connection).build()
+
+    # shares the configuration with every handler
+    application.bot_data['config'] = config
+
+    # only the configured Telegram user is allowed to trade or calculate
+    authorized = filters.User(username=config.telegram_user)
 
     # message handler
-    dp.add_handler(CommandHandler("start", welcome))
+    application.add_handler(CommandHandler("start", welcome))
 
     # help command handler
-    dp.add_handler(CommandHandler("help", help))
+    application.add_handler(CommandHandler("help", help))
 
     conv_handler = ConversationHandler(
-        entry_points=[CommandHandler("trade", Trade_Command), CommandHandler("calculate", Calculation_Command)],
+        entry_points=[CommandHandler("trade", Trade_Command, filters=authorized), CommandHandler("calculate", Calculation_Command, filters=authorized)],
         states={
-            TRADE: [MessageHandler(Filters.text & ~Filters.command, PlaceTrade)],
-            CALCULATE: [MessageHandler(Filters.text & ~Filters.command, CalculateTrade)],
+            TRADE: [MessageHandler(filters.TEXT & ~filters.COMMAND, PlaceTrade)],
+            CALCULATE: [MessageHandler(filters.TEXT & ~filters.COMMAND, CalculateTrade)],
             DECISION: [CommandHandler("yes", PlaceTrade), CommandHandler("no", cancel)]
         },
         fallbacks=[CommandHandler("cancel", cancel)],
     )
 
     # conversation handler for entering trade or calculating trade information
-    dp.add_handler(conv_handler)
+    application.add_handler(conv_handler)
 
     # message handler for all messages that are not included in conversation handler
-    dp.add_handler(MessageHandler(Filters.text, unknown_command))
+    application.add_handler(MessageHandler(filters.TEXT & authorized, unknown_command))
+
+    # message handler for all messages from users that are not authorized to use this bot
+    application.add_handler(MessageHandler(filters.TEXT, unauthorized))
 
     # log all errors
-    dp.add_error_handler(error)
+    application.add_error_handler(error)
     
     # listens for incoming updates from Telegram
-    updater.start_webhook(listen="0.0.0.0", port=PORT, url_path=TOKEN, webhook_url=APP_URL + TOKEN)
-    updater.idle()
+    application.run_webhook(listen="0.0.0.0", port=config.port, url_path=config.token, webhook_url=config.app_url + config.token)
 
     return
 